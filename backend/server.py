@@ -1,37 +1,122 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+import time
+
+# Taken before the heavy imports below so the startup log can include them
+MODULE_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, status
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.datastructures import Headers, MutableHeaders
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError
+from pymongo import UpdateOne, IndexModel, ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone, timedelta
 from passlib.context import CryptContext
 import jwt
+import numpy as np
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import qrcode
 import io
 import base64
+import asyncio
+import hashlib
+import resource
+import multiprocessing
+import csv
+import itertools
+import json
+import re
+import zlib
+import bisect
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection (opened per worker in the app lifespan)
+# `db` reads from the primary; `read_db` serves reads that tolerate replication lag
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+MONGO_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', 90))
+
+def get_db(request: Request) -> AsyncIOMotorDatabase:
+    return request.app.state.db
+
+def get_read_db(request: Request) -> AsyncIOMotorDatabase:
+    return request.app.state.read_db
+
+def tolerant_read_preference():
+    if MONGO_READ_PREFERENCE not in READ_PREFERENCES:
+        raise ValueError(f"Unknown MONGO_READ_PREFERENCE '{MONGO_READ_PREFERENCE}'")
+    if MONGO_READ_PREFERENCE == "primary":
+        return Primary()
+    return READ_PREFERENCES[MONGO_READ_PREFERENCE](max_staleness=MONGO_MAX_STALENESS_SECONDS)
+
+def mongo_client_options() -> dict:
+    return {
+        "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', 100)),
+        "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+        "maxIdleTimeMS": int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 300000)),
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+        "connectTimeoutMS": int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+        "waitQueueTimeoutMS": int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 10000)),
+    }
+
+MONGO_INDEXES = {
+    "users": [IndexModel([("id", ASCENDING)]), IndexModel([("email", ASCENDING)])],
+    "events": [IndexModel([("id", ASCENDING)]), IndexModel([("organizer_id", ASCENDING)]), IndexModel([("category", ASCENDING)])],
+    "registrations": [
+        IndexModel([("id", ASCENDING)]),
+        IndexModel([("event_id", ASCENDING), ("user_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING)]),
+        # Timeseries polls only scan the open bucket: campus-wide by time, per event by (event, time)
+        IndexModel([("registered_at", ASCENDING)]),
+        IndexModel([("event_id", ASCENDING), ("registered_at", ASCENDING)]),
+    ],
+    "feedback": [
+        IndexModel([("event_id", ASCENDING), ("user_id", ASCENDING)]),
+        IndexModel([("created_at", ASCENDING)]),
+        IndexModel([("event_id", ASCENDING), ("created_at", ASCENDING)]),
+    ],
+    "idempotency_keys": [
+        IndexModel([("key", ASCENDING)], unique=True),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+}
 
 # Security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
 
-# Create the main app
-app = FastAPI()
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
 api_router = APIRouter(prefix="/api")
 
 # Models
@@ -85,6 +170,13 @@ class EventCreate(BaseModel):
     organizer_emails: List[str] = []
     image_url: Optional[str] = None
 
+class EventStatusUpdate(BaseModel):
+    event_id: str
+    status: str
+
+class BulkStatusUpdate(BaseModel):
+    updates: List[EventStatusUpdate]
+
 class Registration(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -129,12 +221,20 @@ class EventUpdate(BaseModel):
     status: Optional[str] = None
     image_url: Optional[str] = None
 
+EVENT_STATUSES = {"upcoming", "ongoing", "completed", "cancelled"}
+BULK_MAX_EVENTS = int(os.environ.get('BULK_MAX_EVENTS', 1000))
+BULK_MAX_BYTES = int(os.environ.get('BULK_MAX_BYTES', 5 * 1024 * 1024))
+
 # Helper functions
+@lru_cache(maxsize=None)
+def get_pwd_context() -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
@@ -151,7 +251,7 @@ def decode_token(token: str) -> dict:
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncIOMotorDatabase = Depends(get_db)):
     token = credentials.credentials
     payload = decode_token(token)
     user_id = payload.get("user_id")
@@ -162,7 +262,85 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         raise HTTPException(status_code=404, detail="User not found")
     return User(**user)
 
+def format_validation_errors(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()]
+
+def parse_events_csv(content: str, max_rows: Optional[int] = None) -> List[dict]:
+    rows = []
+    # Stop one row past the limit; that is enough for the caller to reject the file
+    for row in itertools.islice(csv.DictReader(io.StringIO(content)), max_rows):
+        row = {k.strip(): (v.strip() if v is not None else v) for k, v in row.items() if k}
+        emails = row.get("organizer_emails")
+        row["organizer_emails"] = [e.strip() for e in emails.split(";") if e.strip()] if emails else []
+        if not row.get("image_url"):
+            row["image_url"] = None
+        rows.append(row)
+    return rows
+
+def decode_events_csv(data: bytes) -> List[dict]:
+    try:
+        return parse_events_csv(data.decode("utf-8-sig"), BULK_MAX_EVENTS + 1)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV file must be UTF-8 encoded")
+    except csv.Error as e:
+        raise HTTPException(status_code=400, detail=f"Malformed CSV: {e}")
+
+async def read_limited_body(request: Request, max_bytes: int, detail: str) -> bytes:
+    """Read the request body, refusing it with a 413 as soon as it passes max_bytes."""
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail=detail)
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=413, detail=detail)
+    return bytes(body)
+
+async def parse_form(request: Request, body: bytes):
+    """Parse a multipart body that was already read (and size-checked) instead of the socket."""
+    async def receive_body():
+        return {"type": "http.request", "body": body, "more_body": False}
+    return await Request(request.scope, receive_body).form()
+
+async def read_bulk_event_rows(request: Request) -> List[dict]:
+    content_type = request.headers.get("content-type", "")
+    body = await read_limited_body(request, BULK_MAX_BYTES, f"Bulk import body exceeds {BULK_MAX_BYTES} bytes")
+    if content_type.startswith("multipart/form-data"):
+        form = await parse_form(request, body)
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing CSV file field 'file'")
+        return decode_events_csv(await upload.read())
+    if content_type.startswith("text/csv"):
+        return decode_events_csv(body)
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or a CSV upload")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of events")
+    return rows
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def stream_json_list(cursor, model) -> StreamingResponse:
+    """Stream a cursor as a JSON array in ~64KB chunks instead of building the whole list."""
+    async def body():
+        chunk = "["
+        separator = ""
+        async for doc in cursor:
+            chunk += separator + model(**doc).model_dump_json()
+            separator = ","
+            if len(chunk) >= STREAM_CHUNK_BYTES:
+                yield chunk
+                chunk = ""
+        yield chunk + "]"
+    return StreamingResponse(body(), media_type="application/json")
+
 def generate_qr_code(data: str) -> str:
+    import qrcode
+
     qr = qrcode.QRCode(version=1, box_size=10, border=5)
     qr.add_data(data)
     qr.make(fit=True)
@@ -172,9 +350,244 @@ def generate_qr_code(data: str) -> str:
     img_str = base64.b64encode(buffer.getvalue()).decode()
     return f"data:image/png;base64,{img_str}"
 
+# Idempotency
+IDEMPOTENT_PATHS = {"/api/events", "/api/events/bulk", "/api/registrations/register", "/api/feedback"}
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 60 * 60))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get('IDEMPOTENCY_MAX_ENTRIES', 10000))
+IDEMPOTENCY_MAX_BYTES = int(os.environ.get('IDEMPOTENCY_MAX_BYTES', 64 * 1024 * 1024))
+# Larger responses (e.g. big bulk-import results) are not kept; retries get a 409 instead of a replay
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.environ.get('IDEMPOTENCY_MAX_BODY_BYTES', 256 * 1024))
+# A pending marker older than this is assumed abandoned (worker crashed) and may be taken over
+IDEMPOTENCY_PENDING_SECONDS = int(os.environ.get('IDEMPOTENCY_PENDING_SECONDS', 120))
+IDEMPOTENCY_POLL_SECONDS = 0.1
+IDEMPOTENCY_MAX_POLL_SECONDS = 2.0
+
+class IdempotencyStore:
+    """Per-worker LRU front cache of completed responses, bounded by count, bytes and TTL.
+
+    The idempotency_keys collection is the source of truth shared by all workers.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict = OrderedDict()
+        self.in_flight: dict = {}
+        self.total_bytes = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] <= time.monotonic():
+            self.pop(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def pop(self, key: str):
+        entry = self.entries.pop(key)
+        self.total_bytes -= len(entry["body"] or b"")
+
+    def put(self, key: str, fingerprint: str, status_code: int, headers: list, body: Optional[bytes]):
+        if key in self.entries:
+            self.pop(key)
+        self.entries[key] = {
+            "fingerprint": fingerprint,
+            "status_code": status_code,
+            "headers": headers,
+            "body": body,
+            "expires_at": time.monotonic() + self.ttl_seconds,
+        }
+        self.total_bytes += len(body or b"")
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self.pop(next(iter(self.entries)))
+
+class IdempotencyMiddleware:
+    """Replays stored responses for POSTs that carry an Idempotency-Key; other requests pass straight through.
+
+    A unique "pending" marker in MongoDB decides which worker runs a request; duplicates on
+    other workers wait for the stored response instead of running the handler again.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.store = IdempotencyStore(IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_MAX_BYTES, IDEMPOTENCY_TTL_SECONDS)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in IDEMPOTENT_PATHS:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get("idempotency-key")
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.extend(message.get("body", b""))
+            more_body = message.get("more_body", False)
+            # Bulk imports are the largest bodies these endpoints accept
+            if len(body) > BULK_MAX_BYTES:
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": f"Request body exceeds {BULK_MAX_BYTES} bytes"}
+                )
+                await response(scope, receive, send)
+                return
+        body = bytes(body)
+
+        # Keys are scoped to the caller and the endpoint so two users can't collide
+        key_scope = f"{headers.get('authorization', '')}|{scope['path']}|{idempotency_key}"
+        store_key = hashlib.sha256(key_scope.encode()).hexdigest()
+        fingerprint = hashlib.sha256(body).hexdigest()
+        collection = scope["app"].state.db.idempotency_keys
+
+        while True:
+            entry = self.store.get(store_key)
+            if entry:
+                await self.replay(entry, fingerprint, scope, receive, send)
+                return
+            pending = self.store.in_flight.get(store_key)
+            if pending is None:
+                break
+            # Coalesce onto the in-flight request in this worker, then replay whatever it stored
+            await asyncio.shield(pending)
+
+        pending = asyncio.get_running_loop().create_future()
+        self.store.in_flight[store_key] = pending
+        try:
+            try:
+                entry = await self.claim(collection, store_key, fingerprint)
+                claimed = entry is None
+            except PyMongoError as e:
+                # Without the shared store, fall back to this worker's cache alone
+                logger.warning("Idempotency store unavailable: %s", e)
+                entry, claimed = None, False
+            if entry is not None:
+                if entry["state"] == "done":
+                    self.store.put(store_key, entry["fingerprint"], entry["status_code"], entry["headers"], entry["body"])
+                await self.replay(entry, fingerprint, scope, receive, send)
+                return
+            await self.run(scope, receive, send, body, collection, store_key, fingerprint, claimed)
+        finally:
+            del self.store.in_flight[store_key]
+            pending.set_result(None)
+
+    async def claim(self, collection, store_key: str, fingerprint: str) -> Optional[dict]:
+        """Return None once this worker owns the key, or the entry another worker stored for it."""
+        delay = IDEMPOTENCY_POLL_SECONDS
+        while True:
+            now = datetime.now(timezone.utc)
+            marker = {
+                "key": store_key,
+                "fingerprint": fingerprint,
+                "state": "pending",
+                "expires_at": now + timedelta(seconds=IDEMPOTENCY_PENDING_SECONDS),
+            }
+            try:
+                await collection.insert_one(marker)
+                return None
+            except DuplicateKeyError:
+                pass
+            entry = await collection.find_one({"key": store_key}, {"_id": 0})
+            if entry is None:
+                # Released or expired between the insert and the read
+                continue
+            if entry["state"] == "done" or entry["fingerprint"] != fingerprint:
+                entry["headers"] = [tuple(header) for header in entry.get("headers", [])]
+                return entry
+            # Take over a marker left behind by a worker that died mid-request
+            if await collection.find_one_and_update(
+                {"key": store_key, "state": "pending", "expires_at": {"$lte": now}},
+                {"$set": {"expires_at": marker["expires_at"]}}
+            ):
+                return None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, IDEMPOTENCY_MAX_POLL_SECONDS)
+
+    async def replay(self, entry: dict, fingerprint: str, scope, receive, send):
+        if entry["fingerprint"] != fingerprint:
+            response = JSONResponse(
+                status_code=422,
+                content={"detail": "Idempotency-Key reused with a different request body"}
+            )
+            await response(scope, receive, send)
+            return
+        if entry["body"] is None:
+            response = JSONResponse(
+                status_code=409,
+                content={"detail": "Request already processed; its response is too large to replay"}
+            )
+            await response(scope, receive, send)
+            return
+        await send({
+            "type": "http.response.start",
+            "status": entry["status_code"],
+            "headers": entry["headers"] + [(b"idempotent-replayed", b"true")]
+        })
+        await send({"type": "http.response.body", "body": entry["body"]})
+
+    async def run(self, scope, receive, send, body: bytes, collection, store_key: str, fingerprint: str, claimed: bool):
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response_start = {}
+        response_body = bytearray()
+        storable = True
+
+        async def send_and_record(message):
+            nonlocal storable
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            elif message["type"] == "http.response.body" and storable:
+                response_body.extend(message.get("body", b""))
+                storable = len(response_body) <= IDEMPOTENCY_MAX_BODY_BYTES
+            await send(message)
+
+        stored = False
+        try:
+            await self.app(scope, receive_body, send_and_record)
+            # Server errors are not stored so the client can retry them for real
+            if response_start and response_start["status"] < 500:
+                response_headers = [tuple(header) for header in response_start.get("headers", [])]
+                stored_body = bytes(response_body) if storable else None
+                self.store.put(store_key, fingerprint, response_start["status"], response_headers, stored_body)
+                if claimed:
+                    try:
+                        await collection.update_one({"key": store_key}, {"$set": {
+                            "state": "done",
+                            "status_code": response_start["status"],
+                            "headers": [list(header) for header in response_headers],
+                            "body": stored_body,
+                            "expires_at": datetime.now(timezone.utc) + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+                        }})
+                        stored = True
+                    except PyMongoError as e:
+                        logger.warning("Could not store idempotent response: %s", e)
+        finally:
+            if claimed and not stored:
+                # Let a retry run the request for real
+                try:
+                    await collection.delete_one({"key": store_key, "state": "pending"})
+                except PyMongoError as e:
+                    logger.warning("Could not release idempotency key: %s", e)
+
 # Auth endpoints
 @api_router.post("/auth/register", response_model=Token)
-async def register(user_data: UserCreate):
+async def register(user_data: UserCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
     existing_user = await db.users.find_one({"email": user_data.email})
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -194,7 +607,7 @@ async def register(user_data: UserCreate):
     return Token(access_token=token, token_type="bearer", user=user)
 
 @api_router.post("/auth/login", response_model=Token)
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, db: AsyncIOMotorDatabase = Depends(get_db)):
     user = await db.users.find_one({"email": credentials.email})
     if not user or not verify_password(credentials.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -207,18 +620,440 @@ async def login(credentials: UserLogin):
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+# Recommendations
+RECOMMENDER_REFRESH_SECONDS = int(os.environ.get('RECOMMENDER_REFRESH_SECONDS', 60))
+RECOMMENDER_REBUILD_SECONDS = int(os.environ.get('RECOMMENDER_REBUILD_SECONDS', 3600))
+CATEGORY_AFFINITY_WEIGHT = 0.5
+POPULARITY_WEIGHT = 0.05
+
+class RecommendationEngine:
+    """Event co-occurrence ("also registered for") and category affinity, held in memory per worker.
+
+    Co-occurrence counts are sparse: a CSR matrix built in bulk from the registrations,
+    plus a dict-of-counts overlay for registrations applied since the last rebuild.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.event_index: dict = {}
+        self.event_docs: List[Optional[dict]] = []
+        self.category_names: List[str] = [""]
+        self.category_lookup: dict = {"": 0}
+        self.user_events: dict = {}
+        self.watermark = ""
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.counts = np.zeros(0, dtype=np.float32)
+        self.delta: dict = {}
+        self.reserve(64)
+
+    def reserve(self, capacity: int):
+        old = self.size
+        self.popularity = self.grow(getattr(self, "popularity", None), capacity, np.float32, old)
+        self.category_codes = self.grow(getattr(self, "category_codes", None), capacity, np.int32, old)
+        self.dates = self.grow(getattr(self, "dates", None), capacity, "<U32", old)
+        self.active = self.grow(getattr(self, "active", None), capacity, bool, old)
+
+    @staticmethod
+    def grow(array, capacity: int, dtype, used: int):
+        grown = np.zeros(capacity, dtype=dtype)
+        if array is not None:
+            grown[:used] = array[:used]
+        return grown
+
+    def ensure_event(self, event_id: str) -> int:
+        idx = self.event_index.get(event_id)
+        if idx is None:
+            idx = self.size
+            if idx >= len(self.popularity):
+                self.reserve(2 * len(self.popularity))
+            self.event_index[event_id] = idx
+            self.event_docs.append(None)
+            self.size += 1
+        return idx
+
+    def load_events(self, docs: List[dict]):
+        loaded = set()
+        for doc in docs:
+            idx = self.ensure_event(doc["id"])
+            loaded.add(idx)
+            category = doc.get("category", "")
+            if category not in self.category_lookup:
+                self.category_lookup[category] = len(self.category_names)
+                self.category_names.append(category)
+            self.event_docs[idx] = doc
+            self.category_codes[idx] = self.category_lookup[category]
+            self.dates[idx] = doc.get("date", "")
+            self.active[idx] = doc.get("status") == "upcoming"
+        # Deleted events keep their slot until the next full rebuild but are never recommended
+        for idx in range(self.size):
+            if idx not in loaded:
+                self.event_docs[idx] = None
+                self.active[idx] = False
+
+    def bump(self, row: int, col: int, amount: int):
+        row_delta = self.delta.setdefault(row, {})
+        row_delta[col] = row_delta.get(col, 0) + amount
+
+    def add_registration(self, user_id: str, event_id: str):
+        idx = self.ensure_event(event_id)
+        owned = self.user_events.setdefault(user_id, set())
+        if idx in owned:
+            return
+        for other in owned:
+            self.bump(idx, other, 1)
+            self.bump(other, idx, 1)
+        self.popularity[idx] += 1
+        owned.add(idx)
+
+    def remove_registration(self, user_id: str, event_id: str):
+        idx = self.event_index.get(event_id)
+        owned = self.user_events.get(user_id)
+        if idx is None or not owned or idx not in owned:
+            return
+        owned.discard(idx)
+        for other in owned:
+            self.bump(idx, other, -1)
+            self.bump(other, idx, -1)
+        self.popularity[idx] -= 1
+
+    def apply_registrations(self, registrations: List[dict]):
+        for reg in registrations:
+            self.add_registration(reg["user_id"], reg["event_id"])
+            self.watermark = max(self.watermark, reg.get("registered_at", ""))
+
+    async def refresh(self, database):
+        """Pick up new events and registrations since the last load; cancellations wait for a rebuild."""
+        events = await database.events.find({}, {"_id": 0}).to_list(None)
+        query = {"registered_at": {"$gte": self.watermark}} if self.watermark else {}
+        registrations = await database.registrations.find(
+            query, {"_id": 0, "user_id": 1, "event_id": 1, "registered_at": 1}
+        ).to_list(None)
+        self.load_events(events)
+        self.apply_registrations(registrations)
+
+    def build(self, registrations: List[dict]):
+        """Bulk-load registrations into an empty engine as a CSR co-occurrence matrix."""
+        if not registrations:
+            return
+        users: dict = {}
+        user_codes = np.fromiter((users.setdefault(r["user_id"], len(users)) for r in registrations), np.int64, len(registrations))
+        event_codes = np.fromiter((self.ensure_event(r["event_id"]) for r in registrations), np.int64, len(registrations))
+        self.watermark = max(r.get("registered_at", "") for r in registrations)
+
+        pairs = np.unique(np.stack([user_codes, event_codes], axis=1), axis=0)
+        user_codes, event_codes = pairs[:, 0], pairs[:, 1]
+        counts = np.bincount(user_codes)
+        starts = np.cumsum(counts) - counts
+        # Pair every registration with every other registration of the same user
+        sizes = counts[user_codes]
+        offsets = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        rows = np.repeat(event_codes, sizes)
+        partners = event_codes[np.arange(sizes.sum()) - offsets + np.repeat(starts[user_codes], sizes)]
+        off_diagonal = rows != partners
+        n = self.size
+        keys, key_counts = np.unique(rows[off_diagonal] * n + partners[off_diagonal], return_counts=True)
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(keys // n, minlength=n))])
+        self.indices = (keys % n).astype(np.int32)
+        self.counts = key_counts.astype(np.float32)
+        self.popularity[:n] = np.bincount(event_codes, minlength=n)
+
+        user_names = list(users)
+        for user_code, owned in zip(np.unique(user_codes), np.split(event_codes, starts[1:])):
+            self.user_events[user_names[user_code]] = set(owned.tolist())
+
+    @classmethod
+    async def load(cls, database) -> "RecommendationEngine":
+        engine = cls()
+        events = await database.events.find({}, {"_id": 0}).to_list(None)
+        registrations = await database.registrations.find(
+            {}, {"_id": 0, "user_id": 1, "event_id": 1, "registered_at": 1}
+        ).to_list(None)
+        engine.load_events(events)
+        # The engine isn't shared yet, so the heavy lifting can leave the event loop
+        await asyncio.to_thread(engine.build, registrations)
+        return engine
+
+    def cooccurrence_sums(self, owned: List[int], n: int) -> np.ndarray:
+        """Sum the co-occurrence rows of the given events into a dense length-n vector."""
+        sums = np.zeros(n, dtype=np.float32)
+        base_rows = [idx for idx in owned if idx < len(self.indptr) - 1]
+        if base_rows:
+            columns = np.concatenate([self.indices[self.indptr[idx]:self.indptr[idx + 1]] for idx in base_rows])
+            weights = np.concatenate([self.counts[self.indptr[idx]:self.indptr[idx + 1]] for idx in base_rows])
+            sums += np.bincount(columns, weights=weights, minlength=n)[:n].astype(np.float32)
+        for idx in owned:
+            for col, count in self.delta.get(idx, {}).items():
+                sums[col] += count
+        return sums
+
+    def recommend(self, user_id: str, limit: int) -> List[dict]:
+        n = self.size
+        if n == 0:
+            return []
+        owned = list(self.user_events.get(user_id, ()))
+        popularity = self.popularity[:n]
+        codes = self.category_codes[:n]
+        scores = np.zeros(n, dtype=np.float32)
+        if owned:
+            # Dividing by sqrt(popularity) keeps blockbuster events from drowning out real affinity
+            co = self.cooccurrence_sums(owned, n) / np.sqrt(popularity + 1)
+            if co.max() > 0:
+                scores += co / co.max()
+            affinity = np.bincount(codes[owned], minlength=len(self.category_names)) / len(owned)
+            scores += CATEGORY_AFFINITY_WEIGHT * affinity[codes]
+        if popularity.max() > 0:
+            scores += POPULARITY_WEIGHT * popularity / popularity.max()
+
+        today = datetime.now(timezone.utc).date().isoformat()
+        candidates = self.active[:n] & (self.dates[:n] >= today)
+        candidates[owned] = False
+        ids = np.flatnonzero(candidates)
+        top = ids[np.argsort(-scores[ids], kind="stable")[:limit]]
+        return [self.event_docs[idx] for idx in top]
+
+async def run_recommender(state):
+    last_rebuild = time.monotonic()
+    while True:
+        await asyncio.sleep(RECOMMENDER_REFRESH_SECONDS)
+        try:
+            if time.monotonic() - last_rebuild >= RECOMMENDER_REBUILD_SECONDS:
+                state.recommender = await RecommendationEngine.load(state.read_db)
+                last_rebuild = time.monotonic()
+            else:
+                await state.recommender.refresh(state.read_db)
+        except PyMongoError as e:
+            logger.warning("Could not refresh recommendations: %s", e)
+
+@api_router.get("/events/recommended", response_model=List[Event])
+async def get_recommended_events(request: Request, limit: int = 10, current_user: User = Depends(get_current_user)):
+    return request.app.state.recommender.recommend(current_user.id, max(1, min(limit, 50)))
+
+# Search suggestions
+SUGGEST_REFRESH_SECONDS = int(os.environ.get('SUGGEST_REFRESH_SECONDS', 60))
+SUGGEST_SCAN_LIMIT = 256
+SUGGEST_KIND_PRIORITY = {"title": 0, "category": 1, "location": 2}
+
+def normalize_suggest_text(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+class PrefixIndex:
+    """Sorted array of (term, kind, text, event_id, whole) searched by bisect on the query prefix.
+
+    Titles get one entry per event; categories and locations are shared across
+    events and reference-counted so each appears once.
+    """
+
+    def __init__(self):
+        self.entries: List[tuple] = []
+        self.event_entries: dict = {}
+        self.shared_counts: dict = {}
+        # While a replacement snapshot loads, writes are also logged here to be replayed onto it
+        self.pending_writes: Optional[List[tuple]] = None
+
+    @staticmethod
+    def event_terms(doc: dict) -> List[tuple]:
+        terms = set()
+        for kind in SUGGEST_KIND_PRIORITY:
+            text = doc.get(kind) or ""
+            words = normalize_suggest_text(text).split(" ")
+            event_id = doc["id"] if kind == "title" else ""
+            # Index every word start so "conf" also finds "Tech Conference"
+            for start in range(len(words)):
+                term = " ".join(words[start:])
+                if term:
+                    terms.add((term, kind, text, event_id, start == 0))
+        return sorted(terms)
+
+    def add_event(self, doc: dict):
+        self.remove_event(doc["id"])
+        if self.pending_writes is not None:
+            self.pending_writes.append(("add", doc))
+        entries = self.event_terms(doc)
+        for entry in entries:
+            if not entry[3]:
+                self.shared_counts[entry] = self.shared_counts.get(entry, 0) + 1
+                if self.shared_counts[entry] > 1:
+                    continue
+            bisect.insort(self.entries, entry)
+        self.event_entries[doc["id"]] = entries
+
+    def remove_event(self, event_id: str):
+        if self.pending_writes is not None:
+            self.pending_writes.append(("remove", event_id))
+        for entry in self.event_entries.pop(event_id, []):
+            if not entry[3]:
+                self.shared_counts[entry] -= 1
+                if self.shared_counts[entry] > 0:
+                    continue
+                del self.shared_counts[entry]
+            position = bisect.bisect_left(self.entries, entry)
+            if position < len(self.entries) and self.entries[position] == entry:
+                del self.entries[position]
+
+    @classmethod
+    def from_events(cls, docs: List[dict]) -> "PrefixIndex":
+        index = cls()
+        for doc in docs:
+            entries = index.event_terms(doc)
+            index.event_entries[doc["id"]] = entries
+            for entry in entries:
+                if not entry[3]:
+                    index.shared_counts[entry] = index.shared_counts.get(entry, 0) + 1
+        index.entries = sorted(
+            {entry for entries in index.event_entries.values() for entry in entries}
+        )
+        return index
+
+    def suggest(self, query: str, limit: int) -> List[dict]:
+        prefix = normalize_suggest_text(query)
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self.entries, (prefix,))
+        matches = {}
+        for term, kind, text, event_id, whole in self.entries[start:start + SUGGEST_SCAN_LIMIT]:
+            if not term.startswith(prefix):
+                break
+            key = (kind, text, event_id)
+            if key not in matches or whole:
+                matches[key] = (SUGGEST_KIND_PRIORITY[kind], not whole, len(text), text)
+        ranked = sorted(matches.items(), key=lambda item: item[1])[:limit]
+        suggestions = []
+        for (kind, text, event_id), _ in ranked:
+            suggestion = {"text": text, "type": kind}
+            if event_id:
+                suggestion["event_id"] = event_id
+            suggestions.append(suggestion)
+        return suggestions
+
+async def load_suggest_index(database) -> PrefixIndex:
+    docs = await database.events.find({}, {"_id": 0, "id": 1, "title": 1, "category": 1, "location": 1}).to_list(None)
+    return PrefixIndex.from_events(docs)
+
+async def run_suggest_refresh(state):
+    # Resync with writes made by other workers. Read from the primary: a lagging secondary
+    # would drop events this worker just wrote until the next cycle.
+    while True:
+        await asyncio.sleep(SUGGEST_REFRESH_SECONDS)
+        current = state.suggest_index
+        current.pending_writes = []
+        try:
+            fresh = await load_suggest_index(state.db)
+        except PyMongoError as e:
+            logger.warning("Could not refresh search suggestions: %s", e)
+            continue
+        finally:
+            writes, current.pending_writes = current.pending_writes, None
+        # Writes made while the snapshot loaded may or may not be in it; replaying is idempotent
+        for action, item in writes:
+            if action == "add":
+                fresh.add_event(item)
+            else:
+                fresh.remove_event(item)
+        state.suggest_index = fresh
+
+@api_router.get("/events/suggest")
+async def suggest_events(request: Request, q: str = "", limit: int = 8):
+    return request.app.state.suggest_index.suggest(q, max(1, min(limit, 20)))
+
 # Event endpoints
 @api_router.post("/events", response_model=Event)
-async def create_event(event_data: EventCreate, current_user: User = Depends(get_current_user)):
+async def create_event(request: Request, event_data: EventCreate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role not in ["admin", "organizer"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     event = Event(**event_data.model_dump(), organizer_id=current_user.id)
     await db.events.insert_one(event.model_dump())
+    request.app.state.suggest_index.add_event(event.model_dump())
     return event
 
+@api_router.post("/events/bulk")
+async def bulk_create_events(request: Request, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    if current_user.role not in ["admin", "organizer"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    rows = await read_bulk_event_rows(request)
+    if len(rows) > BULK_MAX_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_EVENTS} events per request")
+    
+    errors = []
+    events = []
+    for row_number, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"row": row_number, "errors": ["Row must be an object"]})
+            continue
+        try:
+            event_data = EventCreate(**row)
+        except ValidationError as e:
+            errors.append({"row": row_number, "errors": format_validation_errors(e)})
+            continue
+        events.append((row_number, Event(**event_data.model_dump(), organizer_id=current_user.id)))
+    
+    inserted = [event for _, event in events]
+    if events:
+        try:
+            await db.events.insert_many([event.model_dump() for _, event in events], ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"] for err in e.details.get("writeErrors", [])}
+            for err in e.details.get("writeErrors", []):
+                errors.append({"row": events[err["index"]][0], "errors": [err.get("errmsg", "Write failed")]})
+            inserted = [event for index, (_, event) in enumerate(events) if index not in failed]
+        for event in inserted:
+            request.app.state.suggest_index.add_event(event.model_dump())
+    
+    errors.sort(key=lambda err: err["row"])
+    return {
+        "total_rows": len(rows),
+        "inserted_count": len(inserted),
+        "event_ids": [event.id for event in inserted],
+        "errors": errors
+    }
+
+@api_router.post("/events/bulk/status")
+async def bulk_update_event_status(update_data: BulkStatusUpdate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    if current_user.role not in ["admin", "organizer"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if len(update_data.updates) > BULK_MAX_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_EVENTS} events per request")
+    
+    event_ids = [u.event_id for u in update_data.updates]
+    owners = {
+        e["id"]: e["organizer_id"]
+        for e in await db.events.find({"id": {"$in": event_ids}}, {"_id": 0, "id": 1, "organizer_id": 1}).to_list(None)
+    }
+    
+    errors = []
+    operations = []
+    for row_number, update in enumerate(update_data.updates):
+        if update.status not in EVENT_STATUSES:
+            errors.append({"row": row_number, "event_id": update.event_id, "errors": [f"Invalid status '{update.status}'"]})
+        elif update.event_id not in owners:
+            errors.append({"row": row_number, "event_id": update.event_id, "errors": ["Event not found"]})
+        elif current_user.role != "admin" and owners[update.event_id] != current_user.id:
+            errors.append({"row": row_number, "event_id": update.event_id, "errors": ["Not authorized"]})
+        else:
+            operations.append((row_number, update, UpdateOne({"id": update.event_id}, {"$set": {"status": update.status}})))
+    
+    modified_count = 0
+    if operations:
+        try:
+            result = await db.events.bulk_write([op for _, _, op in operations], ordered=False)
+            modified_count = result.modified_count
+        except BulkWriteError as e:
+            modified_count = e.details.get("nModified", 0)
+            for err in e.details.get("writeErrors", []):
+                row_number, update, _ = operations[err["index"]]
+                errors.append({"row": row_number, "event_id": update.event_id, "errors": [err.get("errmsg", "Write failed")]})
+    
+    errors.sort(key=lambda err: err["row"])
+    return {
+        "total_rows": len(update_data.updates),
+        "modified_count": modified_count,
+        "errors": errors
+    }
+
 @api_router.get("/events", response_model=List[Event])
-async def get_events(category: Optional[str] = None, search: Optional[str] = None):
+async def get_events(category: Optional[str] = None, search: Optional[str] = None, read_db: AsyncIOMotorDatabase = Depends(get_read_db)):
     query = {}
     if category:
         query["category"] = category
@@ -228,18 +1063,18 @@ async def get_events(category: Optional[str] = None, search: Optional[str] = Non
             {"description": {"$regex": search, "$options": "i"}}
         ]
     
-    events = await db.events.find(query, {"_id": 0}).to_list(1000)
-    return events
+    return stream_json_list(read_db.events.find(query, {"_id": 0}).limit(1000), Event)
 
 @api_router.get("/events/{event_id}", response_model=Event)
-async def get_event(event_id: str):
+async def get_event(event_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    # CreateEvent opens this page right after POST /events, so read from the primary
     event = await db.events.find_one({"id": event_id}, {"_id": 0})
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     return event
 
 @api_router.put("/events/{event_id}", response_model=Event)
-async def update_event(event_id: str, event_data: EventUpdate, current_user: User = Depends(get_current_user)):
+async def update_event(request: Request, event_id: str, event_data: EventUpdate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     event = await db.events.find_one({"id": event_id})
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -251,10 +1086,11 @@ async def update_event(event_id: str, event_data: EventUpdate, current_user: Use
     await db.events.update_one({"id": event_id}, {"$set": update_data})
     
     updated_event = await db.events.find_one({"id": event_id}, {"_id": 0})
+    request.app.state.suggest_index.add_event(updated_event)
     return Event(**updated_event)
 
 @api_router.delete("/events/{event_id}")
-async def delete_event(event_id: str, current_user: User = Depends(get_current_user)):
+async def delete_event(request: Request, event_id: str, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     event = await db.events.find_one({"id": event_id})
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -263,11 +1099,12 @@ async def delete_event(event_id: str, current_user: User = Depends(get_current_u
         raise HTTPException(status_code=403, detail="Not authorized")
     
     await db.events.delete_one({"id": event_id})
+    request.app.state.suggest_index.remove_event(event_id)
     return {"message": "Event deleted successfully"}
 
 # Registration endpoints
 @api_router.post("/registrations/register", response_model=Registration)
-async def register_for_event(reg_data: RegistrationCreate, current_user: User = Depends(get_current_user)):
+async def register_for_event(request: Request, reg_data: RegistrationCreate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     event = await db.events.find_one({"id": reg_data.event_id})
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -292,15 +1129,15 @@ async def register_for_event(reg_data: RegistrationCreate, current_user: User =
     )
     
     await db.registrations.insert_one(registration.model_dump())
+    request.app.state.recommender.add_registration(current_user.id, reg_data.event_id)
     return registration
 
 @api_router.get("/registrations/my", response_model=List[Registration])
-async def get_my_registrations(current_user: User = Depends(get_current_user)):
-    registrations = await db.registrations.find({"user_id": current_user.id}, {"_id": 0}).to_list(1000)
-    return registrations
+async def get_my_registrations(current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    return stream_json_list(db.registrations.find({"user_id": current_user.id}, {"_id": 0}).limit(1000), Registration)
 
 @api_router.get("/registrations/event/{event_id}", response_model=List[Registration])
-async def get_event_registrations(event_id: str, current_user: User = Depends(get_current_user)):
+async def get_event_registrations(event_id: str, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     event = await db.events.find_one({"id": event_id})
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -308,11 +1145,10 @@ async def get_event_registrations(event_id: str, current_user: User = Depends(ge
     if current_user.role != "admin" and event["organizer_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    registrations = await db.registrations.find({"event_id": event_id}, {"_id": 0}).to_list(1000)
-    return registrations
+    return stream_json_list(db.registrations.find({"event_id": event_id}, {"_id": 0}).limit(1000), Registration)
 
 @api_router.delete("/registrations/{registration_id}")
-async def cancel_registration(registration_id: str, current_user: User = Depends(get_current_user)):
+async def cancel_registration(request: Request, registration_id: str, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     registration = await db.registrations.find_one({"id": registration_id})
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
@@ -321,11 +1157,13 @@ async def cancel_registration(registration_id: str, current_user: User = Depends
         raise HTTPException(status_code=403, detail="Not authorized")
     
     await db.registrations.delete_one({"id": registration_id})
+    request.app.state.recommender.remove_registration(current_user.id, registration["event_id"])
+    invalidate_timeseries(request.app.state.timeseries_cache, "registrations", registration["event_id"])
     return {"message": "Registration cancelled successfully"}
 
 # Feedback endpoints
 @api_router.post("/feedback", response_model=Feedback)
-async def submit_feedback(feedback_data: FeedbackCreate, current_user: User = Depends(get_current_user)):
+async def submit_feedback(feedback_data: FeedbackCreate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     event = await db.events.find_one({"id": feedback_data.event_id})
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -346,13 +1184,14 @@ async def submit_feedback(feedback_data: FeedbackCreate, current_user: User = De
     return feedback
 
 @api_router.get("/feedback/event/{event_id}", response_model=List[Feedback])
-async def get_event_feedback(event_id: str):
+async def get_event_feedback(event_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    # EventDetails refetches this right after POST /feedback, so it must see the caller's write
     feedback_list = await db.feedback.find({"event_id": event_id}, {"_id": 0}).to_list(1000)
     return feedback_list
 
 # Analytics endpoints
 @api_router.get("/analytics/event/{event_id}")
-async def get_event_analytics(event_id: str, current_user: User = Depends(get_current_user)):
+async def get_event_analytics(event_id: str, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db), read_db: AsyncIOMotorDatabase = Depends(get_read_db)):
     event = await db.events.find_one({"id": event_id})
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -360,9 +1199,9 @@ async def get_event_analytics(event_id: str, current_user: User = Depends(get_cu
     if current_user.role != "admin" and event["organizer_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    registrations = await db.registrations.count_documents({"event_id": event_id})
-    attended = await db.registrations.count_documents({"event_id": event_id, "attendance": True})
-    feedback_list = await db.feedback.find({"event_id": event_id}, {"_id": 0}).to_list(1000)
+    registrations = await read_db.registrations.count_documents({"event_id": event_id})
+    attended = await read_db.registrations.count_documents({"event_id": event_id, "attendance": True})
+    feedback_list = await read_db.feedback.find({"event_id": event_id}, {"_id": 0}).to_list(1000)
     
     avg_rating = sum(f["rating"] for f in feedback_list) / len(feedback_list) if feedback_list else 0
     
@@ -376,17 +1215,18 @@ async def get_event_analytics(event_id: str, current_user: User = Depends(get_cu
     }
 
 @api_router.get("/analytics/overview")
-async def get_overview_analytics(current_user: User = Depends(get_current_user)):
+async def get_overview_analytics(current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db), read_db: AsyncIOMotorDatabase = Depends(get_read_db)):
     if current_user.role == "admin":
-        events = await db.events.count_documents({})
-        users = await db.users.count_documents({})
-        registrations = await db.registrations.count_documents({})
+        events = await read_db.events.count_documents({})
+        users = await read_db.users.count_documents({})
+        registrations = await read_db.registrations.count_documents({})
     elif current_user.role == "organizer":
-        events = await db.events.count_documents({"organizer_id": current_user.id})
-        registrations = await db.registrations.count_documents({"event_id": {"$in": [e["id"] for e in await db.events.find({"organizer_id": current_user.id}, {"_id": 0, "id": 1}).to_list(1000)]}})
+        events = await read_db.events.count_documents({"organizer_id": current_user.id})
+        registrations = await read_db.registrations.count_documents({"event_id": {"$in": [e["id"] for e in await read_db.events.find({"organizer_id": current_user.id}, {"_id": 0, "id": 1}).to_list(1000)]}})
         users = 0
     else:
-        events = await db.events.count_documents({})
+        events = await read_db.events.count_documents({})
+        # A student's own count is read from the primary so a new registration shows up immediately
         registrations = await db.registrations.count_documents({"user_id": current_user.id})
         users = 0
     
@@ -396,9 +1236,257 @@ async def get_overview_analytics(current_user: User = Depends(get_current_user))
         "total_registrations": registrations
     }
 
+# Time-bucketed analytics
+TIMESERIES_BUCKETS = {"hour", "day"}
+TIMESERIES_CACHE_MAX_ENTRIES = int(os.environ.get('TIMESERIES_CACHE_MAX_ENTRIES', 1024))
+# Cancellations in other workers can't invalidate this worker's closed buckets,
+# so closed buckets are recomputed from scratch after this long to converge
+TIMESERIES_CACHE_TTL_SECONDS = int(os.environ.get('TIMESERIES_CACHE_TTL_SECONDS', 60 * 60))
+
+def timeseries_cache_key(collection_name: str, match: dict, bucket: str) -> tuple:
+    return (collection_name, repr(sorted(match.items())), bucket)
+
+def invalidate_timeseries(timeseries_cache: OrderedDict, collection_name: str, event_id: str):
+    """Drop this worker's cached series that include an event, e.g. after a registration is deleted."""
+    for bucket in TIMESERIES_BUCKETS:
+        for match in ({}, {"event_id": event_id}):
+            timeseries_cache.pop(timeseries_cache_key(collection_name, match, bucket), None)
+
+def truncate_to_bucket(moment: datetime, bucket: str) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+async def aggregate_buckets(collection, match: dict, time_field: str, bucket: str, rating: bool) -> dict:
+    # Timestamps are stored as UTC isoformat strings, so parse the seconds-precision prefix
+    timestamp = {
+        "$dateFromString": {
+            "dateString": {"$substrBytes": [f"${time_field}", 0, 19]},
+            "format": "%Y-%m-%dT%H:%M:%S",
+            "timezone": "UTC"
+        }
+    }
+    group = {"_id": {"$dateTrunc": {"date": timestamp, "unit": bucket}}, "count": {"$sum": 1}}
+    if rating:
+        group["rating_sum"] = {"$sum": "$rating"}
+    pipeline = [{"$match": match}, {"$group": group}]
+    return {
+        row["_id"]: {"count": row["count"], "rating_sum": row.get("rating_sum", 0)}
+        async for row in collection.aggregate(pipeline)
+    }
+
+async def get_bucketed_series(timeseries_cache: OrderedDict, collection, match: dict, time_field: str, bucket: str, rating: bool = False) -> List[dict]:
+    """Closed buckets are cached (LRU, up to a TTL); only the still-open bucket is re-aggregated."""
+    cache_key = timeseries_cache_key(collection.name, match, bucket)
+    # A bucket only counts as closed once secondaries are guaranteed to have caught up with it
+    settled = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=MONGO_MAX_STALENESS_SECONDS)
+    current_start = truncate_to_bucket(settled, bucket)
+    cached = timeseries_cache.get(cache_key)
+    if cached is None or cached["built_at"] + TIMESERIES_CACHE_TTL_SECONDS <= time.monotonic():
+        cached = {"closed": {}, "closed_until": None, "built_at": time.monotonic()}
+
+    query = dict(match)
+    if cached["closed_until"]:
+        query[time_field] = {"$gte": cached["closed_until"].replace(tzinfo=timezone.utc).isoformat()}
+    fresh = await aggregate_buckets(collection, query, time_field, bucket, rating)
+
+    closed = dict(cached["closed"])
+    open_buckets = {}
+    for start, values in fresh.items():
+        if start < current_start:
+            closed[start] = values
+        else:
+            open_buckets[start] = values
+    timeseries_cache[cache_key] = {"closed": closed, "closed_until": current_start, "built_at": cached["built_at"]}
+    timeseries_cache.move_to_end(cache_key)
+    while len(timeseries_cache) > TIMESERIES_CACHE_MAX_ENTRIES:
+        timeseries_cache.popitem(last=False)
+
+    series = []
+    for start, values in sorted({**closed, **open_buckets}.items()):
+        point = {"bucket": start.replace(tzinfo=timezone.utc).isoformat(), "count": values["count"]}
+        if rating:
+            point["average_rating"] = round(values["rating_sum"] / values["count"], 2)
+        series.append(point)
+    return series
+
+@api_router.get("/analytics/event/{event_id}/timeseries")
+async def get_event_timeseries(request: Request, event_id: str, bucket: str = "day", current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db), read_db: AsyncIOMotorDatabase = Depends(get_read_db)):
+    if bucket not in TIMESERIES_BUCKETS:
+        raise HTTPException(status_code=400, detail="bucket must be 'hour' or 'day'")
+    
+    event = await db.events.find_one({"id": event_id})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    if current_user.role != "admin" and event["organizer_id"] != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    return {
+        "event_id": event_id,
+        "bucket": bucket,
+        "registrations": await get_bucketed_series(request.app.state.timeseries_cache, read_db.registrations, {"event_id": event_id}, "registered_at", bucket),
+        "feedback": await get_bucketed_series(request.app.state.timeseries_cache, read_db.feedback, {"event_id": event_id}, "created_at", bucket, rating=True)
+    }
+
+@api_router.get("/analytics/timeseries")
+async def get_campus_timeseries(request: Request, bucket: str = "day", current_user: User = Depends(get_current_user), read_db: AsyncIOMotorDatabase = Depends(get_read_db)):
+    if bucket not in TIMESERIES_BUCKETS:
+        raise HTTPException(status_code=400, detail="bucket must be 'hour' or 'day'")
+    
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admin can view campus-wide analytics")
+    
+    return {
+        "bucket": bucket,
+        "registrations": await get_bucketed_series(request.app.state.timeseries_cache, read_db.registrations, {}, "registered_at", bucket),
+        "feedback": await get_bucketed_series(request.app.state.timeseries_cache, read_db.feedback, {}, "created_at", bucket, rating=True)
+    }
+
+# Image endpoints
+IMAGE_DIR = Path(os.environ.get('IMAGE_DIR', ROOT_DIR / 'images'))
+IMAGE_WIDTHS = (320, 640, 1280)
+IMAGE_FORMATS = {"webp": ("WEBP", "image/webp"), "jpg": ("JPEG", "image/jpeg")}
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', 10 * 1024 * 1024))
+# Room for multipart boundaries and part headers around the file itself
+IMAGE_FORM_OVERHEAD_BYTES = 64 * 1024
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+# A small compressed file can declare enormous dimensions; refuse before decoding
+IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', 40_000_000))
+IMAGE_BACKGROUND = (255, 255, 255, 255)
+IMAGE_VARIANT_PATTERN = re.compile(r"^(\d+)\.(webp|jpg)$")
+IMAGE_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+def image_variant_names() -> List[str]:
+    return [f"{width}.{ext}" for width in IMAGE_WIDTHS for ext in IMAGE_FORMATS]
+
+class ImageTooLargeError(ValueError):
+    pass
+
+def render_image_variants(data: bytes, target_dir: str):
+    """Runs in the image process pool; writes every width/format variant into target_dir."""
+    import warnings
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", Image.DecompressionBombWarning)
+            image = Image.open(io.BytesIO(data))
+    except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+        raise ImageTooLargeError(f"Image exceeds {IMAGE_MAX_PIXELS} pixels")
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+    target = Path(target_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    for width in IMAGE_WIDTHS:
+        # Never upscale; narrow originals are stored as-is under every width
+        scaled_width = min(width, image.width)
+        scaled = image.resize((scaled_width, max(1, round(image.height * scaled_width / image.width))), Image.LANCZOS)
+        for ext, (pil_format, _) in IMAGE_FORMATS.items():
+            output = scaled
+            if pil_format == "JPEG" and scaled.mode == "RGBA":
+                # JPEG has no alpha; flatten onto white rather than letting transparent pixels turn black
+                output = Image.alpha_composite(Image.new("RGBA", scaled.size, IMAGE_BACKGROUND), scaled).convert("RGB")
+            # Concurrent uploads of the same file render into the same directory
+            tmp_path = target / f".{width}.{ext}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+            try:
+                output.save(tmp_path, format=pil_format, quality=80, optimize=True)
+                tmp_path.replace(target / f"{width}.{ext}")
+            finally:
+                tmp_path.unlink(missing_ok=True)
+
+def get_image_pool(state) -> ProcessPoolExecutor:
+    if state.image_pool is None:
+        # Forking would copy Motor's monitor threads and the running event loop into the child
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        state.image_pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context(start_method))
+    return state.image_pool
+
+def image_urls(digest: str) -> dict:
+    return {name: f"/api/images/{digest}/{name}" for name in image_variant_names()}
+
+def parse_byte_range(range_header: str, size: int):
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        raise HTTPException(status_code=416, detail="Invalid range", headers={"Content-Range": f"bytes */{size}"})
+    if match.group(1) == "":
+        start, end = max(0, size - int(match.group(2))), size - 1
+    else:
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+@api_router.post("/images")
+async def upload_image(request: Request, current_user: User = Depends(get_current_user)):
+    if current_user.role not in ["admin", "organizer"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Read the form ourselves so oversized uploads are refused before they are spooled
+    body = await read_limited_body(request, IMAGE_MAX_BYTES + IMAGE_FORM_OVERHEAD_BYTES, "Image is too large")
+    form = await parse_form(request, body)
+    upload = form.get("file")
+    if upload is None or isinstance(upload, str):
+        raise HTTPException(status_code=400, detail="Missing image file field 'file'")
+    data = await upload.read()
+    if len(data) > IMAGE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    
+    digest = hashlib.sha256(data).hexdigest()
+    target_dir = IMAGE_DIR / digest
+    if not all((target_dir / name).exists() for name in image_variant_names()):
+        try:
+            await asyncio.get_running_loop().run_in_executor(get_image_pool(request.app.state), render_image_variants, data, str(target_dir))
+        except ImageTooLargeError:
+            raise HTTPException(status_code=413, detail=f"Image exceeds {IMAGE_MAX_PIXELS} pixels")
+        except (OSError, ValueError):
+            raise HTTPException(status_code=400, detail="Unsupported or corrupt image")
+    
+    variants = image_urls(digest)
+    return {
+        "id": digest,
+        "image_url": variants[f"{IMAGE_WIDTHS[-1]}.webp"],
+        "variants": variants
+    }
+
+@api_router.get("/images/{digest}/{variant}")
+async def get_image(digest: str, variant: str, request: Request):
+    match = IMAGE_VARIANT_PATTERN.match(variant)
+    if not IMAGE_DIGEST_PATTERN.match(digest) or not match or int(match.group(1)) not in IMAGE_WIDTHS:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    path = IMAGE_DIR / digest / variant
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    # Variants are content-addressed, so a URL's bytes never change
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{digest}-{variant}"',
+        "Accept-Ranges": "bytes"
+    }
+    media_type = IMAGE_FORMATS[match.group(2)][1]
+    if request.headers.get("If-None-Match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    
+    range_header = request.headers.get("Range")
+    if not range_header:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    
+    size = path.stat().st_size
+    start, end = parse_byte_range(range_header, size)
+    with open(path, "rb") as f:
+        f.seek(start)
+        content = f.read(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(content=content, status_code=206, media_type=media_type, headers=headers)
+
 # Organizer endpoints
 @api_router.post("/organizers/add")
-async def add_organizer(org_data: OrganizerAdd, current_user: User = Depends(get_current_user)):
+async def add_organizer(org_data: OrganizerAdd, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admin can add organizers")
     
@@ -410,29 +1498,220 @@ async def add_organizer(org_data: OrganizerAdd, current_user: User = Depends(get
     return {"message": f"User {org_data.email} is now an organizer"}
 
 @api_router.get("/events/my/organized", response_model=List[Event])
-async def get_my_organized_events(current_user: User = Depends(get_current_user)):
+async def get_my_organized_events(current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role not in ["admin", "organizer"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     events = await db.events.find({"organizer_id": current_user.id}, {"_id": 0}).to_list(1000)
     return events
 
-app.include_router(api_router)
+# Compression
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get('COMPRESSION_MINIMUM_SIZE', 1024))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 4))
+# Already-compressed payloads only cost CPU to recompress
+INCOMPRESSIBLE_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "application/pdf")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            weight = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            weight = 0.0
+        weights[coding.strip().lower()] = weight
+    # Highest q-value wins; br before gzip only breaks ties
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    best = max(supported, key=lambda coding: weights.get(coding, weights.get("*", 0.0)))
+    best_weight = weights.get(best, weights.get("*", 0.0))
+    if best_weight <= 0 or weights.get("identity", 0.0) > best_weight:
+        return None
+    return best
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+class ResponseCompressor:
+    def __init__(self, encoding: str, stats: dict):
+        self.encoding = encoding
+        self.stats = stats
+        self.cpu_seconds = 0.0
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        stats["responses"] += 1
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        started = time.thread_time()
+        if self.encoding == "br":
+            output = self.compressor.process(data) + (self.compressor.finish() if final else self.compressor.flush())
+        else:
+            output = self.compressor.compress(data) + self.compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        elapsed = time.thread_time() - started
+        self.cpu_seconds += elapsed
+        self.stats["cpu_seconds"] += elapsed
+        self.stats["bytes_in"] += len(data)
+        self.stats["bytes_out"] += len(output)
+        return output
+
+class CompressionMiddleware:
+    """Negotiated br/gzip compression; streamed bodies are flushed chunk by chunk."""
+
+    def __init__(self, app, stats: dict, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.stats = stats
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+        pending = bytearray()
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                    or headers.get("content-type", "").startswith(INCOMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                # Hold back small leading chunks until we know the body is worth compressing
+                pending.extend(body)
+                if more_body and len(pending) < self.minimum_size:
+                    return
+                if len(pending) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": bytes(pending), "more_body": False})
+                    return
+                compressor = ResponseCompressor(encoding, self.stats)
+                compressed = compressor.compress(bytes(pending), final=not more_body)
+                headers = MutableHeaders(scope=start_message)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(compressed))
+                    headers.append("Server-Timing", f"compress;dur={compressor.cpu_seconds * 1000:.2f}")
+                await send(start_message)
+                await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+                return
+            await send({"type": "http.response.body", "body": compressor.compress(body, final=not more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+def seconds_since_process_start() -> float:
+    """Wall time since this worker process was created, read from /proc; falls back to module import."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesised command name start at field 3; starttime is field 22
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter() - MODULE_IMPORT_STARTED
+
+async def ensure_indexes(database):
+    for collection_name, indexes in MONGO_INDEXES.items():
+        await database[collection_name].create_indexes(indexes)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    state = app.state
+    started = time.perf_counter()
+    state.client = AsyncIOMotorClient(mongo_url, **mongo_client_options())
+    state.db = state.client[os.environ['DB_NAME']]
+    state.read_db = state.client.get_database(os.environ['DB_NAME'], read_preference=tolerant_read_preference())
+    get_pwd_context()
+    # Warm-up steps are independent, so overlap their round trips
+    indexes, recommendations, suggestions = await asyncio.gather(
+        ensure_indexes(state.db),
+        RecommendationEngine.load(state.read_db),
+        load_suggest_index(state.db),
+        return_exceptions=True
+    )
+    for name, result in (("MongoDB indexes", indexes), ("recommendations", recommendations), ("search suggestions", suggestions)):
+        if isinstance(result, PyMongoError):
+            logger.warning("Could not warm %s: %s", name, result)
+        elif isinstance(result, BaseException):
+            raise result
+    if isinstance(recommendations, RecommendationEngine):
+        state.recommender = recommendations
+    if isinstance(suggestions, PrefixIndex):
+        state.suggest_index = suggestions
+    recommender_task = asyncio.create_task(run_recommender(state))
+    suggest_task = asyncio.create_task(run_suggest_refresh(state))
+    ready = time.perf_counter()
+    # ru_maxrss is reported in kilobytes on Linux
+    logger.info(
+        "Worker %d ready %.0f ms after process start (import and app setup %.0f ms, lifespan %.0f ms), max RSS %.1f MB",
+        os.getpid(),
+        seconds_since_process_start() * 1000,
+        (started - MODULE_IMPORT_STARTED) * 1000,
+        (ready - started) * 1000,
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    )
+    yield
+    recommender_task.cancel()
+    suggest_task.cancel()
+    stats = state.compression_stats
+    logger.info(
+        "Compressed %d responses: %d -> %d bytes using %.2f s CPU",
+        stats["responses"],
+        stats["bytes_in"],
+        stats["bytes_out"],
+        stats["cpu_seconds"]
+    )
+    state.client.close()
+    if state.image_pool is not None:
+        state.image_pool.shutdown()
+
+def create_app() -> FastAPI:
+    app = FastAPI(lifespan=lifespan)
+    app.state.recommender = RecommendationEngine()
+    app.state.suggest_index = PrefixIndex()
+    app.state.timeseries_cache = OrderedDict()
+    app.state.image_pool = None
+    app.state.compression_stats = {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0}
+    app.include_router(api_router)
+    app.add_middleware(IdempotencyMiddleware)
+    app.add_middleware(CompressionMiddleware, stats=app.state.compression_stats)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    return app
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+def __getattr__(name: str):
+    # `uvicorn server:app` still works, but importing the module no longer builds an app
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
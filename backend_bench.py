@@ -0,0 +1,77 @@
+import requests
+import sys
+import time
+from datetime import datetime, timedelta
+
+class CollegeEventAPIBenchmark:
+    def __init__(self, base_url="https://campus-pulse-79.preview.emergentagent.com"):
+        self.base_url = base_url
+        self.api_url = f"{base_url}/api"
+        self.organizer_token = None
+
+    def headers(self):
+        return {'Authorization': f'Bearer {self.organizer_token}'}
+
+    def setup_organizer(self):
+        """Register a throwaway organizer account for the benchmark"""
+        timestamp = datetime.now().strftime('%H%M%S%f')
+        response = requests.post(f"{self.api_url}/auth/register", json={
+            "email": f"bench_organizer_{timestamp}@test.com",
+            "password": "BenchPass123!",
+            "name": f"Bench Organizer {timestamp}",
+            "role": "organizer"
+        })
+        response.raise_for_status()
+        self.organizer_token = response.json()['access_token']
+
+    def make_events(self, count, label):
+        event_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+        return [{
+            "title": f"Bench {label} Event {i}",
+            "description": "Semester calendar benchmark event",
+            "category": "Workshop",
+            "date": event_date,
+            "time": "10:00",
+            "location": "Seminar Hall",
+            "capacity": 50
+        } for i in range(count)]
+
+    def bench_per_event(self, count):
+        """Create events one request at a time via POST /events"""
+        events = self.make_events(count, "single")
+        start = time.perf_counter()
+        for event in events:
+            requests.post(f"{self.api_url}/events", json=event, headers=self.headers()).raise_for_status()
+        return time.perf_counter() - start
+
+    def bench_bulk(self, count):
+        """Create the same number of events in one POST /events/bulk request"""
+        events = self.make_events(count, "bulk")
+        start = time.perf_counter()
+        response = requests.post(f"{self.api_url}/events/bulk", json=events, headers=self.headers())
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        if response.json()['inserted_count'] != count:
+            print(f"❌ Bulk import inserted {response.json()['inserted_count']}/{count} events")
+        return elapsed
+
+    def run(self, count):
+        print("🚀 Benchmarking event import throughput")
+        print(f"Testing against: {self.base_url}")
+        self.setup_organizer()
+
+        per_event = self.bench_per_event(count)
+        bulk = self.bench_bulk(count)
+
+        print(f"📊 Per-event: {count} events in {per_event:.2f}s ({count / per_event:.1f} events/s)")
+        print(f"📊 Bulk:      {count} events in {bulk:.2f}s ({count / bulk:.1f} events/s)")
+        print(f"📊 Speedup:   {per_event / bulk:.1f}x")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    base_url = sys.argv[2] if len(sys.argv) > 2 else "https://campus-pulse-79.preview.emergentagent.com"
+    CollegeEventAPIBenchmark(base_url).run(count)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
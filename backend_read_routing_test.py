@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+from pymongo import monitoring
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+class ReadRecorder(monitoring.CommandListener):
+    """Records which server each read command was sent to"""
+    def __init__(self):
+        self.servers = []
+
+    def started(self, event):
+        if event.command_name in ("find", "aggregate", "count"):
+            self.servers.append(event.connection_id)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+recorder = ReadRecorder()
+monitoring.register(recorder)
+
+import server
+
+async def read_from(collection):
+    recorder.servers.clear()
+    await collection.find_one({})
+    return recorder.servers[-1]
+
+async def run_checks():
+    expect_secondary = server.MONGO_READ_PREFERENCE in ("secondary", "secondaryPreferred")
+    app = server.create_app()
+    async with server.lifespan(app):
+        state = app.state
+        await state.client.admin.command("ping")
+        primary = state.client.primary
+        print(f"Primary: {primary}, secondaries: {sorted(state.client.secondaries)}")
+
+        failures = []
+        db_server = await read_from(state.db.events)
+        print(f"db      -> {db_server}")
+        if db_server != primary:
+            failures.append(f"db read went to {db_server}, expected primary {primary}")
+
+        read_db_server = await read_from(state.read_db.events)
+        print(f"read_db -> {read_db_server} (MONGO_READ_PREFERENCE={server.MONGO_READ_PREFERENCE})")
+        if expect_secondary and read_db_server == primary:
+            failures.append(f"read_db read went to the primary {primary}, expected a secondary")
+        if server.MONGO_READ_PREFERENCE == "primary" and read_db_server != primary:
+            failures.append(f"read_db read went to {read_db_server}, expected primary {primary}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Reads are routed as configured")
+    return not failures
+
+def main():
+    print(f"Checking read routing against: {os.environ['MONGO_URL']}")
+    return 0 if asyncio.run(run_checks()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -196,6 +196,60 @@ class CollegeEventAPITester:
             self.test_event_id = response['id']
             print(f"   Event created with ID: {self.test_event_id}")
         
+        # Test Idempotent Retry of Create Event
+        retry_headers = {
+            'Authorization': f'Bearer {self.organizer_token}',
+            'Idempotency-Key': f'create-event-{datetime.now().timestamp()}'
+        }
+        success, first = self.run_test(
+            "Create Event (Idempotency-Key)",
+            "POST",
+            "events",
+            200,
+            data=event_data,
+            headers=retry_headers
+        )
+        success, retry = self.run_test(
+            "Retry Create Event (Idempotency-Key)",
+            "POST",
+            "events",
+            200,
+            data=event_data,
+            headers=retry_headers
+        )
+        self.tests_run += 1
+        if success and first.get('id') and first.get('id') == retry.get('id'):
+            self.tests_passed += 1
+            print("   ✅ Retry replayed the original event")
+        else:
+            print("   ❌ Retry created a duplicate event")
+            self.failed_tests.append({
+                'test': "Idempotent Retry Replays Event",
+                'error': "Retry did not replay the original event",
+                'endpoint': "events"
+            })
+        
+        # Test Bulk Event Import
+        success, response = self.run_test(
+            "Bulk Create Events",
+            "POST",
+            "events/bulk",
+            200,
+            data=[event_data, {**event_data, "title": "Test Workshop 2025", "category": "Workshop"}],
+            headers={'Authorization': f'Bearer {self.organizer_token}'}
+        )
+        
+        if success and response.get('event_ids'):
+            print(f"   Bulk imported {response['inserted_count']} events")
+            self.run_test(
+                "Bulk Update Event Status",
+                "POST",
+                "events/bulk/status",
+                200,
+                data={"updates": [{"event_id": event_id, "status": "cancelled"} for event_id in response['event_ids']]},
+                headers={'Authorization': f'Bearer {self.organizer_token}'}
+            )
+        
         # Test Get All Events
         self.run_test(
             "Get All Events",
@@ -221,6 +275,14 @@ class CollegeEventAPITester:
             200
         )
         
+        # Test Search Suggestions
+        self.run_test(
+            "Suggest Events",
+            "GET",
+            "events/suggest?q=Tec",
+            200
+        )
+        
         # Test Filter Events by Category
         self.run_test(
             "Filter Events by Category",
@@ -288,6 +350,15 @@ class CollegeEventAPITester:
             headers={'Authorization': f'Bearer {self.student_token}'}
         )
         
+        # Test Recommended Events
+        self.run_test(
+            "Get Recommended Events",
+            "GET",
+            "events/recommended?limit=5",
+            200,
+            headers={'Authorization': f'Bearer {self.student_token}'}
+        )
+        
         # Test Get Event Registrations (as organizer)
         if self.organizer_token and self.test_event_id:
             self.run_test(
@@ -361,6 +432,31 @@ class CollegeEventAPITester:
                 headers={'Authorization': f'Bearer {self.organizer_token}'}
             )
 
+    def test_timeseries_analytics(self):
+        """Test time-bucketed analytics endpoints"""
+        print("\n" + "="*50)
+        print("TESTING TIMESERIES ANALYTICS")
+        print("="*50)
+        
+        if self.organizer_token and self.test_event_id:
+            for bucket in ["hour", "day"]:
+                self.run_test(
+                    f"Get Event Timeseries ({bucket})",
+                    "GET",
+                    f"analytics/event/{self.test_event_id}/timeseries?bucket={bucket}",
+                    200,
+                    headers={'Authorization': f'Bearer {self.organizer_token}'}
+                )
+        
+        if self.admin_token:
+            self.run_test(
+                "Get Campus Timeseries",
+                "GET",
+                "analytics/timeseries?bucket=day",
+                200,
+                headers={'Authorization': f'Bearer {self.admin_token}'}
+            )
+
     def test_organizer_management(self):
         """Test organizer management (admin only)"""
         print("\n" + "="*50)
@@ -392,6 +488,7 @@ class CollegeEventAPITester:
             self.test_event_registration()
             self.test_feedback_system()
             self.test_analytics()
+            self.test_timeseries_analytics()
             self.test_organizer_management()
             
             # Print final results
@@ -4,3 +4,11 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+const UPLOADED_IMAGE_PATTERN = /^\/api\/images\/([0-9a-f]{64})\/\d+\.(webp|jpg)$/;
+
+export function imageVariantUrl(imageUrl, width) {
+  const match = imageUrl && imageUrl.match(UPLOADED_IMAGE_PATTERN);
+  if (!match) return imageUrl;
+  return `${process.env.REACT_APP_BACKEND_URL}/api/images/${match[1]}/${width}.${match[2]}`;
+}
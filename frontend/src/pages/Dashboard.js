@@ -8,6 +8,7 @@ import { Button } from '../components/ui/button';
 import { Calendar, Users, TrendingUp, Plus, Clock, MapPin } from 'lucide-react';
 import { Badge } from '../components/ui/badge';
 import { toast } from 'sonner';
+import { imageVariantUrl } from '../lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -166,7 +167,7 @@ const Dashboard = () => {
                 >
                   {event.image_url && (
                     <div className="h-48 bg-gradient-to-br from-purple-400 to-pink-400 rounded-t-lg">
-                      <img src={event.image_url} alt={event.title} className="w-full h-full object-cover rounded-t-lg" />
+                      <img src={imageVariantUrl(event.image_url, 640)} loading="lazy" alt={event.title} className="w-full h-full object-cover rounded-t-lg" />
                     </div>
                   )}
                   <CardHeader>
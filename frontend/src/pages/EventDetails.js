@@ -13,6 +13,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle } from '../components/
 import { Textarea } from '../components/ui/textarea';
 import { Label } from '../components/ui/label';
 import { toast } from 'sonner';
+import { imageVariantUrl } from '../lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -129,7 +130,7 @@ const EventDetails = () => {
             <Card data-testid="event-info-card" className="glass-card border-none">
               {event.image_url && (
                 <div className="h-96 bg-gradient-to-br from-purple-400 to-pink-400 rounded-t-lg overflow-hidden">
-                  <img src={event.image_url} alt={event.title} className="w-full h-full object-cover" />
+                  <img src={imageVariantUrl(event.image_url, 1280)} alt={event.title} className="w-full h-full object-cover" />
                 </div>
               )}
               <CardHeader>
@@ -10,6 +10,7 @@ import { Badge } from '../components/ui/badge';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '../components/ui/select';
 import { Calendar, Clock, MapPin, Users, Search } from 'lucide-react';
 import { toast } from 'sonner';
+import { imageVariantUrl } from '../lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -140,7 +141,7 @@ const EventsPage = () => {
               >
                 <div className="h-48 bg-gradient-to-br from-purple-400 to-pink-400 rounded-t-lg overflow-hidden">
                   {event.image_url ? (
-                    <img src={event.image_url} alt={event.title} className="w-full h-full object-cover" />
+                    <img src={imageVariantUrl(event.image_url, 640)} loading="lazy" alt={event.title} className="w-full h-full object-cover" />
                   ) : (
                     <div className="w-full h-full flex items-center justify-center">
                       <Calendar className="h-20 w-20 text-white opacity-50" />